@@ -1,27 +1,297 @@
 # server/github_client.py
 import aiohttp
+import asyncio
+import base64
+import math
+import orjson
 import os
-from typing import Optional, Dict, Any, List
+import time
+from cachetools import TTLCache
+from dataclasses import dataclass, fields as dataclass_fields
+from itertools import chain
+from operator import itemgetter
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator, Callable, Sequence
+from urllib.parse import urlencode, urlsplit
 
 GITHUB_API = "https://api.github.com"
+PER_PAGE_MAX = 100
+
+# Formas de los elementos de listas (issues, búsqueda, archivos de un diff): objetos con
+# __slots__ en lugar de dicts, ya que pueden ser cientos por respuesta. orjson los serializa directo.
+@dataclass(slots=True)
+class IssueOut:
+    number: int
+    title: str
+    state: str
+    labels: List[str]
+    author: Optional[str]
+    created_at: str
+    url: str
+
+
+@dataclass(slots=True)
+class SearchItemOut:
+    number: Optional[int]
+    title: Optional[str]
+    state: Optional[str]
+    repo: str
+    url: Optional[str]
+
+
+# Campos proyectables con `fields` y cómo se extrae cada uno del JSON de GitHub (misma lógica que
+# _issue_out / _search_item_out): la proyección construye el dict directamente, sin pasar por el dataclass
+ISSUE_FIELDS = tuple(f.name for f in dataclass_fields(IssueOut))
+SEARCH_ITEM_FIELDS = tuple(f.name for f in dataclass_fields(SearchItemOut))
+
+_ISSUE_GETTERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "number": itemgetter("number"),
+    "title": itemgetter("title"),
+    "state": itemgetter("state"),
+    "labels": lambda it: [l["name"] for l in it.get("labels", [])],
+    "author": lambda it: (it.get("user") or {}).get("login"),
+    "created_at": itemgetter("created_at"),
+    "url": itemgetter("html_url"),
+}
+_SEARCH_ITEM_GETTERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "number": lambda it: it.get("number"),
+    "title": lambda it: it.get("title"),
+    "state": lambda it: it.get("state"),
+    "repo": lambda it: it.get("repository_url", "").split("/repos/")[-1],
+    "url": lambda it: it.get("html_url"),
+}
+
+
+def _projector(getters: Dict[str, Callable[[Dict[str, Any]], Any]], fields: Sequence[str]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    picked = [(f, getters[f]) for f in fields]
+    return lambda it: {f: get(it) for f, get in picked}
+
+
+@dataclass(slots=True)
+class CompareFileOut:
+    filename: Optional[str]
+    status: Optional[str]
+    additions: Optional[int]
+    deletions: Optional[int]
+    changes: Optional[int]
+
+
+RATE_LIMIT_MAX_WAIT = 60.0  # segundos máximos que se espera a que GitHub levante un rate-limit
+MAX_ATTEMPTS = 3            # intentos ante 5xx / errores de conexión
+RETRY_BACKOFF = 0.5         # segundos; se duplica en cada reintento
+ETAG_CACHE_TTL = 3600       # segundos que se conserva un cuerpo revalidable con If-None-Match
+ETAG_CACHE_MAX_BYTES = 64 * 1024 * 1024  # tope de la caché ETag, medido en bytes de respuesta sin parsear
+OFFLOAD_DECODE_BYTES = 64 * 1024  # a partir de este tamaño el base64 se decodifica fuera del event loop
+
+
+def _decode_base64_text(content: str) -> str:
+    return base64.b64decode(content).decode("utf-8", errors="ignore")
+
+
+
+def _rate_resource(url: str) -> str:
+    """
+    Bucket de rate-limit de GitHub (X-RateLimit-Resource) que consume una URL de la API.
+    """
+    path = urlsplit(url).path
+    if path.startswith("/search/code"):
+        return "code_search"
+    if path.startswith("/search/"):
+        return "search"
+    return "core"
+
+
+class _RateLimiter:
+    """
+    Token bucket (req/s) que además respeta Retry-After y X-RateLimit-Remaining/Reset de GitHub.
+    Los bloqueos se llevan por recurso: agotar `search` no frena las llamadas a `core`.
+    """
+    def __init__(self, rate: float, capacity: int):
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until: Dict[str, float] = {}  # recurso -> epoch (segundos), como X-RateLimit-Reset
+        self._lock = asyncio.Lock()
+
+    def blocked_for(self, resource: str = "core") -> float:
+        return max(0.0, self._blocked_until.get(resource, 0.0) - time.time())
+
+    async def acquire(self, resource: str = "core") -> None:
+        # la espera por bloqueo va fuera del lock para no retener a los demás recursos
+        blocked = self.blocked_for(resource)
+        if 0 < blocked <= RATE_LIMIT_MAX_WAIT:
+            await asyncio.sleep(blocked)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+    def update(self, headers, resource: str = "core") -> None:
+        resource = headers.get("X-RateLimit-Resource") or resource
+        retry_after = headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            self._blocked_until[resource] = time.time() + int(retry_after)
+        elif headers.get("X-RateLimit-Remaining") == "0":
+            reset = headers.get("X-RateLimit-Reset")
+            if reset and reset.isdigit():
+                self._blocked_until[resource] = float(reset)
+
 
 class GitHubClient:
-    def __init__(self, token: Optional[str] = None):
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        max_concurrency: int = 20,
+        rate_per_sec: float = 10.0,
+        burst: Optional[int] = None
+    ):
         self._token = token or os.getenv("GITHUB_TOKEN", "").strip()
+        # br requiere el paquete Brotli; aiohttp descomprime de forma transparente (auto_decompress)
+        self._headers_cached = {"Accept": "application/vnd.github+json", "Accept-Encoding": "gzip, deflate, br"}
+        if self._token:
+            self._headers_cached["Authorization"] = f"Bearer {self._token}"
+        # (url, params) -> (etag, last_modified, raw) para GETs condicionales; cada 304 renueva el TTL.
+        # Se guardan los bytes sin parsear: el tope por bytes es exacto y cada 304 devuelve un objeto nuevo
+        self._cache: TTLCache = TTLCache(maxsize=ETAG_CACHE_MAX_BYTES, ttl=ETAG_CACHE_TTL, getsizeof=lambda v: len(v[2]))
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self._sem = asyncio.Semaphore(max_concurrency)
+        self._limiter = _RateLimiter(rate_per_sec, capacity=burst or max_concurrency)
 
     def _headers(self) -> Dict[str, str]:
-        headers = {"Accept": "application/vnd.github+json"}
-        if self._token:
-            headers["Authorization"] = f"Bearer {self._token}"
-        return headers
+        return self._headers_cached
 
     async def _get(self, session: aiohttp.ClientSession, url: str, params: Dict[str, Any] | None = None) -> Dict[str, Any]:
-        async with session.get(url, headers=self._headers(), params=params) as r:
+        key = (url, frozenset((params or {}).items()))
+        # singleflight: llamadas idénticas concurrentes comparten una sola petición a GitHub
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_json(session, url, params, key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._inflight_done(key, t))
+        # shield: si un llamador se cancela, los demás siguen esperando el mismo resultado
+        return await asyncio.shield(task)
+
+    def _inflight_done(self, key: Tuple, task: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # marca la excepción como recuperada aunque nadie quede esperando
+
+    async def _fetch_json(self, session: aiohttp.ClientSession, url: str, params: Dict[str, Any] | None, key: Tuple) -> Any:
+        cached: Optional[Tuple[Optional[str], Optional[str], bytes]] = self._cache.get(key)
+        headers = self._headers()
+        if cached:
+            etag, last_modified, _ = cached
+            headers = dict(headers)
+            if etag:
+                headers["If-None-Match"] = etag
+            elif last_modified:
+                headers["If-Modified-Since"] = last_modified
+        resource = _rate_resource(url)
+        rate_limit_retried = False
+        attempt = 0
+        while True:
+            await self._limiter.acquire(resource)
+            try:
+                async with self._sem, session.get(url, headers=headers, params=params) as r:
+                    self._limiter.update(r.headers, resource)
+                    # 304 no consume rate-limit y no trae cuerpo: se vuelve a parsear el cuerpo guardado
+                    if r.status == 304 and cached:
+                        self._cache[key] = cached  # renueva la expiración: el recurso sigue vigente
+                        return orjson.loads(cached[2])
+                    # rate-limit: un único reintento si GitHub indica una espera razonable
+                    # (la espera la hace el limiter en el siguiente acquire)
+                    if (r.status in (403, 429) and not rate_limit_retried
+                            and 0 < self._limiter.blocked_for(resource) <= RATE_LIMIT_MAX_WAIT):
+                        rate_limit_retried = True
+                        continue
+                    if r.status < 500 or attempt == MAX_ATTEMPTS - 1:
+                        r.raise_for_status()
+                        raw = await r.read()
+                        body = orjson.loads(raw)
+                        etag = r.headers.get("ETag")
+                        last_modified = r.headers.get("Last-Modified")
+                        # un cuerpo mayor que toda la caché no se guarda (TTLCache lanzaría ValueError)
+                        if (etag or last_modified) and len(raw) <= ETAG_CACHE_MAX_BYTES:
+                            self._cache[key] = (etag, last_modified, raw)
+                        return body
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == MAX_ATTEMPTS - 1:
+                    raise
+            # 5xx o error de conexión transitorio: backoff exponencial fuera del semáforo
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+            attempt += 1
+
+    async def _get_raw(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        params: Dict[str, Any] | None = None,
+        max_bytes: Optional[int] = None
+    ) -> Any:
+        """
+        GET con media type raw: GitHub devuelve los bytes del archivo sin JSON ni base64.
+        Con `max_bytes` pide solo el prefijo vía Range (respuesta 206).
+        Devuelve (bytes, tamaño total o None si no se conoce); si GitHub responde JSON (p.ej. un directorio)
+        devuelve ese JSON ya parseado, y None si conviene reintentar por la ruta JSON. Un 404 se lanza.
+        """
+        headers = {**self._headers(), "Accept": "application/vnd.github.raw"}
+        if max_bytes:
+            # sin compresión: un rango sobre un cuerpo gzip no se podría descomprimir
+            headers["Range"] = f"bytes=0-{max_bytes - 1}"
+            headers["Accept-Encoding"] = "identity"
+        resource = _rate_resource(url)
+        attempt = 0
+        while True:
+            await self._limiter.acquire(resource)
+            try:
+                async with self._sem, session.get(url, headers=headers, params=params) as r:
+                    self._limiter.update(r.headers, resource)
+                    if r.status < 500 or attempt == MAX_ATTEMPTS - 1:
+                        return await self._read_raw(r, max_bytes)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == MAX_ATTEMPTS - 1:
+                    raise
+            # mismo criterio de reintento que _fetch_json: backoff exponencial fuera del semáforo
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+            attempt += 1
+
+    @staticmethod
+    async def _read_raw(r: aiohttp.ClientResponse, max_bytes: Optional[int]) -> Any:
+        # la ruta JSON daría el mismo 404 / el mismo JSON: no se repite la petición
+        if r.status == 404:
             r.raise_for_status()
-            return await r.json()
+        if r.status == 200 and r.content_type == "application/json":
+            return orjson.loads(await r.read())
+        if r.status not in (200, 206):
+            return None
+        if r.status == 206 or not max_bytes:
+            body = await r.read()
+            # Content-Range: bytes 0-2047/123456
+            total = r.headers.get("Content-Range", "").rpartition("/")[2]
+            return body, int(total) if r.status == 206 and total.isdigit() else len(body)
+
+        # el servidor ignoró el Range: leer solo el prefijo del stream y cortar la descarga
+        buf = bytearray()
+        while len(buf) < max_bytes:
+            chunk = await r.content.read(max_bytes - len(buf))
+            if not chunk:
+                break
+            buf += chunk
+        length = r.headers.get("Content-Length", "")
+        if length.isdigit():
+            size = int(length)
+        else:
+            size = len(buf) if r.content.at_eof() else None
+        return bytes(buf), size
 
     async def repo_summary(self, session: aiohttp.ClientSession, owner: str, repo: str) -> Dict[str, Any]:
         data = await self._get(session, f"{GITHUB_API}/repos/{owner}/{repo}")
+        lic = data.get("license")
         return {
             "full_name": data.get("full_name"),
             "description": data.get("description"),
@@ -32,11 +302,66 @@ class GitHubClient:
             "open_issues": data.get("open_issues_count"),
             "watchers": data.get("subscribers_count"),
             "archived": data.get("archived", False),
-            "license": (data.get("license") or {}).get("spdx_id"),
+            "license": lic.get("spdx_id") if lic else None,
             "topics": data.get("topics", []),
             "updated_at": data.get("updated_at"),
         }
 
+    async def _get_pages(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        params: Dict[str, Any],
+        limit: int
+    ) -> List[Any]:
+        """
+        Pide en paralelo todas las páginas necesarias para cubrir `limit` (per_page máx. 100).
+        """
+        if limit <= PER_PAGE_MAX:
+            return [await self._get(session, url, params={**params, "per_page": limit})]
+        pages = math.ceil(limit / PER_PAGE_MAX)
+        # el query string es igual en todas las páginas salvo `page`: se codifica una sola vez
+        base_qs = urlencode({**params, "per_page": PER_PAGE_MAX}, doseq=True)
+        return await asyncio.gather(*[
+            self._get(session, f"{url}?{base_qs}&page={p}")
+            for p in range(1, pages + 1)
+        ])
+
+    async def _get_all(self, session: aiohttp.ClientSession, url: str) -> List[Any]:
+        """
+        Recorre todas las páginas de un listado (per_page máx.) hasta encontrar una incompleta.
+        """
+        out: List[Any] = []
+        page = 1
+        while True:
+            items = await self._get(session, url, params={"per_page": PER_PAGE_MAX, "page": page})
+            out.extend(items)
+            if len(items) < PER_PAGE_MAX:
+                return out
+            page += 1
+
+    @staticmethod
+    def _issue_out(it: Dict[str, Any]) -> IssueOut:
+        user = it.get("user")
+        return IssueOut(
+            number=it["number"],
+            title=it["title"],
+            state=it["state"],
+            labels=[l["name"] for l in it.get("labels", [])],
+            author=user.get("login") if user else None,
+            created_at=it["created_at"],
+            url=it["html_url"],
+        )
+
+    @staticmethod
+    def _issues_params(state: str, labels: Optional[List[str]], assignee: Optional[str]) -> Dict[str, Any]:
+        params: Dict[str, Any] = {"state": state}
+        if labels:
+            params["labels"] = ",".join(labels)
+        if assignee:
+            params["assignee"] = assignee
+        return params
+
     async def list_issues(
         self,
         session: aiohttp.ClientSession,
@@ -44,83 +369,147 @@ class GitHubClient:
         state: str = "open",
         labels: Optional[List[str]] = None,
         assignee: Optional[str] = None,
-        limit: int = 20
-    ) -> List[Dict[str, Any]]:
-        params = {"state": state, "per_page": min(limit, 100)}
-        if labels:
-            params["labels"] = ",".join(labels)
-        if assignee:
-            params["assignee"] = assignee
-        items = await self._get(session, f"{GITHUB_API}/repos/{owner}/{repo}/issues", params=params)
+        limit: int = 20,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Any]:
+        """
+        Issues como IssueOut; con `fields`, dicts con solo esos campos.
+        """
+        params = self._issues_params(state, labels, assignee)
+        pages = await self._get_pages(session, f"{GITHUB_API}/repos/{owner}/{repo}/issues", params, limit)
+        make = self._issue_out if fields is None else _projector(_ISSUE_GETTERS, fields)
         out = []
-        for it in items:
+        for it in chain.from_iterable(pages):
             if "pull_request" in it:
                 continue
-            out.append({
-                "number": it["number"],
-                "title": it["title"],
-                "state": it["state"],
-                "labels": [l["name"] for l in it.get("labels", [])],
-                "author": (it.get("user") or {}).get("login"),
-                "created_at": it["created_at"],
-                "url": it["html_url"],
-            })
+            out.append(make(it))
             if len(out) >= limit:
                 break
         return out
 
-    async def search_issues(self, session: aiohttp.ClientSession, query: str, limit: int = 20) -> List[Dict[str, Any]]:
-        params = {"q": query, "per_page": min(limit, 100)}
-        data = await self._get(session, f"{GITHUB_API}/search/issues", params=params)
+    async def iter_issues(
+        self,
+        session: aiohttp.ClientSession,
+        owner: str, repo: str,
+        state: str = "open",
+        labels: Optional[List[str]] = None,
+        assignee: Optional[str] = None
+    ) -> AsyncIterator[IssueOut]:
+        """
+        Itera todas las issues sin límite; la página N+1 se pide mientras se consume la N.
+        """
+        base_qs = urlencode({**self._issues_params(state, labels, assignee), "per_page": PER_PAGE_MAX}, doseq=True)
+        url = f"{GITHUB_API}/repos/{owner}/{repo}/issues?{base_qs}&page="
+        page = 1
+        pending: Optional[asyncio.Task] = asyncio.create_task(self._get(session, f"{url}{page}"))
+        try:
+            while pending is not None:
+                items = await pending
+                pending = None
+                if len(items) == PER_PAGE_MAX:
+                    page += 1
+                    pending = asyncio.create_task(self._get(session, f"{url}{page}"))
+                for it in items:
+                    if "pull_request" not in it:
+                        yield self._issue_out(it)
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    @staticmethod
+    def _search_item_out(it: Dict[str, Any]) -> SearchItemOut:
+        return SearchItemOut(
+            number=it.get("number"),
+            title=it.get("title"),
+            state=it.get("state"),
+            repo=it.get("repository_url", "").split("/repos/")[-1],
+            url=it.get("html_url"),
+        )
+
+    async def search_issues(
+        self,
+        session: aiohttp.ClientSession,
+        query: str,
+        limit: int = 20,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Any]:
+        """
+        Resultados como SearchItemOut; con `fields`, dicts con solo esos campos.
+        """
+        pages = await self._get_pages(session, f"{GITHUB_API}/search/issues", {"q": query}, limit)
+        make = self._search_item_out if fields is None else _projector(_SEARCH_ITEM_GETTERS, fields)
         out = []
-        for it in data.get("items", []):
-            out.append({
-                "number": it.get("number"),
-                "title": it.get("title"),
-                "state": it.get("state"),
-                "repo": it.get("repository_url", "").split("/repos/")[-1],
-                "url": it.get("html_url"),
-            })
+        for it in chain.from_iterable(data.get("items", []) for data in pages):
+            out.append(make(it))
             if len(out) >= limit:
                 break
         return out
 
     async def pr_status(self, session: aiohttp.ClientSession, owner: str, repo: str, number: int) -> Dict[str, Any]:
-        pr = await self._get(session, f"{GITHUB_API}/repos/{owner}/{repo}/pulls/{number}")
-        sha = (pr.get("head") or {}).get("sha")
-        checks = {}
+        pr_url = f"{GITHUB_API}/repos/{owner}/{repo}/pulls/{number}"
+        # las reviews no dependen del SHA: se piden junto con el PR
+        pr, reviews = await asyncio.gather(
+            self._get(session, pr_url),
+            self._get_all(session, f"{pr_url}/reviews"),
+        )
+        head = pr.get("head")
+        base = pr.get("base")
+        sha = head.get("sha") if head else None
+        checks, status = {}, {}
         if sha:
-            checks = await self._get(session, f"{GITHUB_API}/repos/{owner}/{repo}/commits/{sha}/check-runs")
+            # check-runs y el status combinado dependen solo del SHA: se piden en paralelo
+            commit_url = f"{GITHUB_API}/repos/{owner}/{repo}/commits/{sha}"
+            checks, status = await asyncio.gather(
+                self._get(session, f"{commit_url}/check-runs"),
+                self._get(session, f"{commit_url}/status"),
+            )
         return {
             "number": pr.get("number"),
             "title": pr.get("title"),
             "state": pr.get("state"),
             "mergeable": pr.get("mergeable"),
             "draft": pr.get("draft"),
-            "head_branch": (pr.get("head") or {}).get("ref"),
-            "base_branch": (pr.get("base") or {}).get("ref"),
+            "head_branch": head.get("ref") if head else None,
+            "base_branch": base.get("ref") if base else None,
             "checks_summary": {
                 "total": checks.get("total_count", 0),
                 "statuses": [c["conclusion"] for c in checks.get("check_runs", []) if c.get("conclusion")],
+                "combined_state": status.get("state"),
             },
+            "reviews_summary": self._reviews_summary(reviews),
             "url": pr.get("html_url"),
         }
 
+    @staticmethod
+    def _reviews_summary(reviews: List[Dict[str, Any]]) -> Dict[str, int]:
+        # último estado relevante de cada revisor (los COMMENTED no cambian la decisión)
+        latest: Dict[str, str] = {}
+        for rv in reviews:
+            user = rv.get("user")
+            state = rv.get("state")
+            if user and state in ("APPROVED", "CHANGES_REQUESTED", "DISMISSED"):
+                latest[user.get("login")] = state
+        states = list(latest.values())
+        return {
+            "approved": states.count("APPROVED"),
+            "changes_requested": states.count("CHANGES_REQUESTED"),
+        }
+
     async def get_file(
         self,
         session: aiohttp.ClientSession,
         owner: str,
         repo: str,
         path: str,
-        ref: Optional[str] = None
+        ref: Optional[str] = None,
+        max_bytes: Optional[int] = None
     ) -> Dict[str, Any]:
         params = {"ref": ref} if ref else None
+        url = f"{GITHUB_API}/repos/{owner}/{repo}/contents/{path}"
         try:
-            data = await self._get(
-                session,
-                f"{GITHUB_API}/repos/{owner}/{repo}/contents/{path}",
-                params=params
-            )
+            raw = await self._get_raw(session, url, params=params, max_bytes=max_bytes)
+            # fallback: ruta JSON + base64 (rate-limit u otros errores que la ruta JSON sabe reintentar)
+            data = await self._get(session, url, params=params) if raw is None else raw
         except aiohttp.ClientResponseError as e:
             # fallback: si pidieron README y no existe esa variante, usar endpoint oficial
             if e.status == 404 and path.lower() in ("readme", "readme.md", "readme.rst"):
@@ -132,9 +521,26 @@ class GitHubClient:
             else:
                 raise
 
+        if isinstance(data, tuple):
+            # contenido raw: GitHub no envía metadatos del blob (sha null, type siempre "file")
+            body, size = data
+            return {
+                "path": path,
+                "type": "file",
+                "size": size,
+                "sha": None,
+                "content": body.decode("utf-8", errors="ignore"),
+                "truncated": size is None or len(body) < size,
+            }
+
         if data.get("encoding") == "base64":
-            import base64
-            decoded = base64.b64decode(data.get("content", "")).decode("utf-8", errors="ignore")
+            content = data.get("content", "")
+            if len(content) > OFFLOAD_DECODE_BYTES:
+                # archivos grandes: decodificar en un thread para no bloquear el event loop
+                loop = asyncio.get_running_loop()
+                decoded = await loop.run_in_executor(None, _decode_base64_text, content)
+            else:
+                decoded = _decode_base64_text(content)
         else:
             decoded = data.get("content", "")
 
@@ -148,13 +554,13 @@ class GitHubClient:
 
     async def compare(self, session: aiohttp.ClientSession, owner: str, repo: str, base: str, head: str) -> Dict[str, Any]:
         data = await self._get(session, f"{GITHUB_API}/repos/{owner}/{repo}/compare/{base}...{head}")
-        files = [{
-            "filename": f.get("filename"),
-            "status": f.get("status"),
-            "additions": f.get("additions"),
-            "deletions": f.get("deletions"),
-            "changes": f.get("changes"),
-        } for f in data.get("files", [])]
+        files = [CompareFileOut(
+            filename=f.get("filename"),
+            status=f.get("status"),
+            additions=f.get("additions"),
+            deletions=f.get("deletions"),
+            changes=f.get("changes"),
+        ) for f in data.get("files", [])]
         return {
             "ahead_by": data.get("ahead_by"),
             "behind_by": data.get("behind_by"),
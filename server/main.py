@@ -1,24 +1,55 @@
 # server/main.py
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Response, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field, ValidationError
 import aiohttp
+import asyncio
+import functools
+import orjson
 import os, random
 import pathlib
+from cachetools import TTLCache
 from dotenv import load_dotenv
-from typing import Literal, Optional
-from .github_client import GitHubClient
+from itertools import islice
+from typing import Iterator, Literal, Optional
+from .github_client import GitHubClient, ISSUE_FIELDS, SEARCH_ITEM_FIELDS
 
 load_dotenv()
-app = FastAPI(title="MCP Remote VGC Demo")
+# El event loop (uvloop) lo elige uvicorn con --loop uvloop; ver Dockerfile
+
+
+_GH_TIMEOUT = aiohttp.ClientTimeout(total=25, connect=5)
+# Ritmo propio hacia GitHub (token bucket): peticiones/s sostenidas y ráfaga máxima
+GH_RATE_PER_SEC = float(os.getenv("GITHUB_RATE_PER_SEC", "10"))
+GH_RATE_BURST = int(os.getenv("GITHUB_RATE_BURST", "20"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Una sola ClientSession por proceso: reutiliza conexiones keep-alive hacia api.github.com
+    connector = aiohttp.TCPConnector(limit=100, limit_per_host=20, ttl_dns_cache=300, keepalive_timeout=75)
+    app.state.http = aiohttp.ClientSession(timeout=_GH_TIMEOUT, connector=connector)
+    # El cliente (lock del limiter, semáforo, singleflight) se crea dentro del event loop que lo usa
+    app.state.gh = GitHubClient(rate_per_sec=GH_RATE_PER_SEC, burst=GH_RATE_BURST)
+    try:
+        yield
+    finally:
+        await app.state.http.close()
+
+
+app = FastAPI(title="MCP Remote VGC Demo", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 PROTOCOL = "2025-06-18"
 AUTH_TOKEN = os.getenv("AUTH_TOKEN")
 SERVER_INFO = {"name": os.getenv("MCP_SERVER_NAME", "vgc-remote"),
                "version": os.getenv("MCP_SERVER_VERSION", "0.1.0")}
 
+# Campos proyectables con `fields` (derivados de los dataclasses de salida del cliente)
+IssueField = Literal[ISSUE_FIELDS]
+SearchItemField = Literal[SEARCH_ITEM_FIELDS]
+
 FILES_ROOT = os.getenv("FILES_ROOT", os.path.expanduser("~/mcp_files"))
 FILES_ROOT_PATH = pathlib.Path(FILES_ROOT).resolve()
 FILES_ROOT_PATH.mkdir(parents=True, exist_ok=True) 
@@ -70,7 +101,9 @@ TOOLS = [
                 "state": {"type": "string", "enum": ["open", "closed", "all"], "default": "open"},
                 "labels": {"type": "array", "items": {"type": "string"}},
                 "assignee": {"type": "string"},
-                "limit": {"type": "integer", "minimum": 1, "maximum": 100, "default": 20}
+                "limit": {"type": "integer", "minimum": 1, "maximum": 100, "default": 20},
+                "fields": {"type": "array", "items": {"type": "string", "enum": list(ISSUE_FIELDS)}, "minItems": 1,
+                           "description": "Campos a incluir en data (por defecto todos)"}
             },
             "required": ["owner", "repo"],
             "additionalProperties": False
@@ -78,14 +111,18 @@ TOOLS = [
     },
     {
         "name": "github_get_file",
-        "description": "Lee un archivo de un repo y devuelve su contenido si es texto.",
+        "description": ("Lee un archivo de un repo y devuelve su contenido si es texto. "
+                        "data: path, type, size, sha, content y truncated; el contenido se descarga en raw, "
+                        "así que sha suele ser null y type es \"file\"."),
         "inputSchema": {
             "type": "object",
             "properties": {
                 "owner": {"type": "string"},
                 "repo": {"type": "string"},
                 "path": {"type": "string"},
-                "ref": {"type": "string", "default": "HEAD"}
+                "ref": {"type": "string", "default": "HEAD"},
+                "max_bytes": {"type": ["integer", "null"], "minimum": 1, "default": 2048,
+                              "description": "Bytes máximos a descargar (Range); null = archivo completo"}
             },
             "required": ["owner", "repo", "path"],
             "additionalProperties": False
@@ -98,7 +135,9 @@ TOOLS = [
             "type": "object",
             "properties": {
                 "query": {"type": "string"},
-                "limit": {"type": "integer", "minimum": 1, "maximum": 100, "default": 20}
+                "limit": {"type": "integer", "minimum": 1, "maximum": 100, "default": 20},
+                "fields": {"type": "array", "items": {"type": "string", "enum": list(SEARCH_ITEM_FIELDS)}, "minItems": 1,
+                           "description": "Campos a incluir en data (por defecto todos)"}
             },
             "required": ["query"],
             "additionalProperties": False
@@ -162,6 +201,9 @@ TOOLS = [
     },
 ]
 
+# tools/list es estático: se serializa una sola vez y se incrusta tal cual (orjson.Fragment)
+_TOOLS_LIST_RESULT = orjson.Fragment(orjson.dumps({"tools": TOOLS}))
+
 POKEDEX = [
     {"name": "Pikachu", "types": ["electric"]},
     {"name": "Charizard", "types": ["fire", "flying"]},
@@ -172,6 +214,15 @@ POKEDEX = [
     {"name": "Iron Hands", "types": ["fighting", "electric"]},
 ]
 
+# Índice por tipo con el texto ya formateado, construido una vez al importar
+ALL_POKEMON: list[str] = []
+TYPE_INDEX: dict[str, list[str]] = {}
+for _p in POKEDEX:
+    _label = f"{_p['name']} ({'/'.join(_p['types'])})"
+    ALL_POKEMON.append(_label)
+    for _t in _p["types"]:
+        TYPE_INDEX.setdefault(_t.lower(), []).append(_label)
+
 class RepoInfoArgs(BaseModel):
     owner: str
     repo: str
@@ -183,16 +234,19 @@ class ListIssuesArgs(BaseModel):
     labels: list[str] | None = None
     assignee: str | None = None
     limit: int = Field(default=20, ge=1, le=100)
+    fields: list[IssueField] | None = Field(default=None, min_length=1)
 
 class GetFileArgs(BaseModel):
     owner: str
     repo: str
     path: str
     ref: str | None = "HEAD"
+    max_bytes: int | None = Field(default=2048, ge=1)
 
 class SearchIssuesArgs(BaseModel):
     query: str
     limit: int = Field(default=20, ge=1, le=100)
+    fields: list[SearchItemField] | None = Field(default=None, min_length=1)
 
 class PRStatusArgs(BaseModel):
     owner: str
@@ -212,11 +266,10 @@ def handle_tool(name: str, args: dict):
 
     if name == "random_pokemon":
         t = (args or {}).get("type_filter")
-        pool = [p for p in POKEDEX if not t or t.lower() in p["types"]]
+        pool = TYPE_INDEX.get(t.lower(), []) if t else ALL_POKEMON
         if not pool:
             return {"content": [{"type": "text", "text": "Sin coincidencias para ese tipo."}]}
-        pick = random.choice(pool)
-        return {"content": [{"type": "text", "text": f"Sorteo: {pick['name']} ({'/'.join(pick['types'])})"}]}
+        return {"content": [{"type": "text", "text": f"Sorteo: {random.choice(pool)}"}]}
 
     # herramienta desconocida
     return {"content": [{"type": "text", "text": f"Herramienta desconocida: {name}"}]}
@@ -231,6 +284,18 @@ class FilesReadArgs(BaseModel):
     offset: int = Field(default=0, ge=0)
     limit: int = Field(default=65536, ge=1, le=1048576)
 
+# Validadores de argumentos por herramienta (pydantic-core, sin pasar por __init__)
+VALIDATORS = {
+    "github_repo_info": RepoInfoArgs.model_validate,
+    "github_list_issues": ListIssuesArgs.model_validate,
+    "github_get_file": GetFileArgs.model_validate,
+    "github_search_issues": SearchIssuesArgs.model_validate,
+    "github_pr_status": PRStatusArgs.model_validate,
+    "github_compare": CompareArgs.model_validate,
+    "files_list": FilesListArgs.model_validate,
+    "files_read": FilesReadArgs.model_validate,
+}
+
 
 # Utilidades JSON-RPC
 def jsonrpc_result(id_, result):
@@ -259,195 +324,327 @@ def _resolve_safe(path_str: str) -> pathlib.Path:
     """
     rel = pathlib.Path(path_str.strip("/\\"))
     p = (FILES_ROOT_PATH / rel).resolve()
-    if not str(p).startswith(str(FILES_ROOT_PATH)):
+    # comparación por componentes: un prefijo de texto aceptaría p.ej. /root_evil para /root
+    if not p.is_relative_to(FILES_ROOT_PATH):
         raise PermissionError("Path fuera de FILES_ROOT")
     return p
 
-# Endpoints
-@app.get("/health")
-def health():
-    return {"ok": True, "server": SERVER_INFO}
+def _scan_dir(path) -> Iterator[os.DirEntry]:
+    with os.scandir(path) as it:
+        yield from it
 
-@app.post("/")
-async def rpc(req: Request):
-    check_auth(req)
+def _scan_tree(top) -> Iterator[os.DirEntry]:
+    """
+    Recorre `top` en el mismo orden que os.walk (directorios y luego archivos de cada nivel),
+    reutilizando los DirEntry de scandir. Es perezoso: se detiene en cuanto el consumidor deja de pedir.
+    """
+    try:
+        with os.scandir(top) as it:
+            entries = list(it)
+    except OSError:
+        return
+    dirs = [de for de in entries if de.is_dir()]
+    yield from dirs
+    yield from (de for de in entries if not de.is_dir())
+    for de in dirs:
+        if not de.is_symlink():
+            yield from _scan_tree(de.path)
+
+# Caché de resultados MCP para las herramientas de GitHub, keyed por (tool, args canónicos).
+# Un TTLCache por herramienta; TTL en segundos configurable por env.
+RESULT_CACHE_TTLS = {
+    "github_repo_info": int(os.getenv("CACHE_TTL_REPO", "300")),
+    "github_list_issues": int(os.getenv("CACHE_TTL_ISSUES", "60")),
+    "github_search_issues": int(os.getenv("CACHE_TTL_SEARCH", "60")),
+    "github_pr_status": int(os.getenv("CACHE_TTL_PR_STATUS", "30")),
+    "github_compare": int(os.getenv("CACHE_TTL_COMPARE", "120")),
+    "github_get_file": int(os.getenv("CACHE_TTL_FILE", "300")),
+}
+RESULT_CACHE_SIZE = int(os.getenv("CACHE_MAX_SIZE", "1024"))
+RESULT_CACHES = {name: TTLCache(maxsize=RESULT_CACHE_SIZE, ttl=ttl) for name, ttl in RESULT_CACHE_TTLS.items()}
+# get_file puede guardar archivos completos (max_bytes=null): su caché se acota por bytes de contenido
+RESULT_CACHE_FILE_BYTES = int(os.getenv("CACHE_FILE_MAX_BYTES", str(32 * 1024 * 1024)))
+RESULT_CACHES["github_get_file"] = TTLCache(
+    maxsize=RESULT_CACHE_FILE_BYTES,
+    ttl=RESULT_CACHE_TTLS["github_get_file"],
+    getsizeof=lambda res: len(res["data"].get("content") or "") + 1,
+)
+
+def _result_cache_key(name: str, arguments: dict) -> tuple:
+    return (name, orjson.dumps(arguments, option=orjson.OPT_SORT_KEYS))
+
+def get_cached_result(name: str, arguments: dict) -> Optional[dict]:
+    cache = RESULT_CACHES.get(name)
+    return cache.get(_result_cache_key(name, arguments)) if cache is not None else None
+
+def store_result(name: str, arguments: dict, result: dict) -> None:
+    cache = RESULT_CACHES.get(name)
+    # un resultado mayor que toda la caché no se guarda (TTLCache lanzaría ValueError)
+    if cache is not None and cache.getsizeof(result) <= cache.maxsize:
+        cache[_result_cache_key(name, arguments)] = result
+
+def _projected_lines(items: list) -> str:
+    # con `fields` los elementos ya son dicts proyectados: el preview muestra solo esos campos
+    return "\n".join(", ".join(f"{k}={v}" for k, v in it.items()) for it in islice(items, 10))
+
+# Handlers de herramientas: reciben args ya validados y devuelven el resultado MCP
+class ToolError(Exception):
+    """Error esperado de una herramienta, mapeado a un error JSON-RPC con su status HTTP."""
+    def __init__(self, message: str, status_code: int = 400, code: int = -32000):
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code
+
+async def _tool_repo_info(gh: GitHubClient, session: aiohttp.ClientSession, a: RepoInfoArgs) -> dict:
+    data = await gh.repo_summary(session, a.owner, a.repo)
+    text = (f"{data['full_name']} — {data['stars']} | 🍴 {data['forks']} | "
+            f"issues {data['open_issues']} | default: {data['default_branch']}")
+    return mcp_text_result(text, data)
+
+async def _tool_list_issues(gh: GitHubClient, session: aiohttp.ClientSession, a: ListIssuesArgs) -> dict:
+    items = await gh.list_issues(session, a.owner, a.repo, a.state, a.labels, a.assignee, a.limit, fields=a.fields)
+    if not items:
+        text = f"Sin issues para {a.owner}/{a.repo} con esos filtros."
+    else:
+        lines = _projected_lines(items) if a.fields else "\n".join(
+            f"#{it.number} {it.title} [{it.state}] @{it.author or '?'} ({','.join(it.labels) or '-'})"
+            for it in islice(items, 10)
+        )
+        more = "" if len(items) <= 10 else f"\n… y {len(items)-10} más"
+        text = f"Issues en {a.owner}/{a.repo} (state={a.state}):\n" + lines + more
+    return mcp_text_result(text, items)
+
+async def _tool_get_file(gh: GitHubClient, session: aiohttp.ClientSession, a: GetFileArgs) -> dict:
+    data = await gh.get_file(session, a.owner, a.repo, a.path, a.ref, max_bytes=a.max_bytes)
+    preview = (data.get("content") or "")[:500]
+    tail = "" if not data.get("truncated") and len(data.get("content") or "") <= 500 else "\n…(truncado)"
+    text = f"{a.owner}/{a.repo}@{a.ref or 'HEAD'} — {a.path} (size={data.get('size')}):\n{preview}{tail}"
+    return mcp_text_result(text, data)
+
+async def _tool_search_issues(gh: GitHubClient, session: aiohttp.ClientSession, a: SearchIssuesArgs) -> dict:
+    items = await gh.search_issues(session, a.query, a.limit, fields=a.fields)
+    lines = _projected_lines(items) if a.fields else "\n".join(
+        f"{it.repo} #{it.number or '?'}: {it.title}" for it in islice(items, 10)
+    )
+    more = "" if len(items) <= 10 else f"\n… y {len(items)-10} más"
+    text = "Resultados de búsqueda:\n" + (lines or "— vacío —") + more
+    return mcp_text_result(text, items)
+
+async def _tool_pr_status(gh: GitHubClient, session: aiohttp.ClientSession, a: PRStatusArgs) -> dict:
+    info = await gh.pr_status(session, a.owner, a.repo, a.number)
+    checks = info.get("checks_summary", {})
+    reviews = info.get("reviews_summary", {})
+    text = (f"PR #{info['number']} {info['title']} — state={info['state']}, "
+            f"mergeable={info['mergeable']}, draft={info['draft']}, "
+            f"checks={checks.get('total',0)} ({','.join(checks.get('statuses',[])) or '-'}), "
+            f"approvals={reviews.get('approved',0)}")
+    return mcp_text_result(text, info)
+
+async def _tool_compare(gh: GitHubClient, session: aiohttp.ClientSession, a: CompareArgs) -> dict:
+    comp = await gh.compare(session, a.owner, a.repo, a.base, a.head)
+    files = comp.get("files", [])
+    first = "\n".join(f"{f.status:>9}  +{f.additions}/-{f.deletions}  {f.filename}"
+                      for f in islice(files, 10))
+    more = "" if len(files) <= 10 else f"\n… y {len(files)-10} más"
+    text = (f"Diff {a.base}...{a.head} — ahead {comp['ahead_by']}, behind {comp['behind_by']}, "
+            f"commits {comp['total_commits']}\n{first}{more}")
+    return mcp_text_result(text, comp)
+
+async def _tool_files_list(gh: GitHubClient, session: aiohttp.ClientSession, a: FilesListArgs) -> dict:
+    target = _resolve_safe(a.path)
+    if not target.exists():
+        raise ToolError(f"No existe: {a.path}", status_code=404)
+    if not target.is_dir():
+        raise ToolError(f"No es directorio: {a.path}")
+
+    scan = _scan_tree(target) if a.recursive else _scan_dir(target)
+    entries = [
+        {"path": os.path.relpath(de.path, FILES_ROOT_PATH), "is_dir": de.is_dir(), "size": de.stat().st_size}
+        for de in islice(scan, a.limit)
+    ]
+
+    txt_lines = "\n".join(f"[DIR] {e['path']}" if e["is_dir"] else f"      {e['path']} ({e['size']} bytes)"
+                          for e in islice(entries, 20))
+    more = "" if len(entries) <= 20 else f"\n… y {len(entries)-20} más"
+    text = f"Listado de {a.path} (root={FILES_ROOT}):\n" + (txt_lines or "— vacío —") + more
+    return mcp_text_result(text, entries)
+
+async def _tool_files_read(gh: GitHubClient, session: aiohttp.ClientSession, a: FilesReadArgs) -> dict:
+    p = _resolve_safe(a.path)
+    if not p.exists():
+        raise ToolError(f"No existe: {a.path}", status_code=404)
+    if not p.is_file():
+        raise ToolError(f"No es archivo: {a.path}")
+
+    # solo se leen los bytes pedidos, no el archivo completo
+    size = p.stat().st_size
+    start = min(a.offset, size)
+    length = min(a.limit, size - start)
+    fd = os.open(p, os.O_RDONLY)
     try:
-        body = await req.json()
-    except Exception:
-        return JSONResponse(jsonrpc_error(None, message="Invalid JSON"), status_code=400)
+        raw = os.pread(fd, length, start)
+    finally:
+        os.close(fd)
+    end = start + len(raw)
+    chunk = raw.decode("utf-8", errors="replace")
+    eof = (end >= size)
+
+    preview = chunk[:500]
+    tail = "" if len(chunk) <= 500 else "\n…(truncado)"
+    text = f"{a.path} [{start}:{end}/{size}] eof={eof}\n{preview}{tail}"
+    payload = {"path": a.path, "offset": start, "end": end, "size": size, "eof": eof, "content": chunk}
+    return mcp_text_result(text, payload)
+
+TOOL_DISPATCH = {
+    "github_repo_info": _tool_repo_info,
+    "github_list_issues": _tool_list_issues,
+    "github_get_file": _tool_get_file,
+    "github_search_issues": _tool_search_issues,
+    "github_pr_status": _tool_pr_status,
+    "github_compare": _tool_compare,
+    "files_list": _tool_files_list,
+    "files_read": _tool_files_read,
+}
+
+def jsonrpc_errors(fn):
+    """
+    Mapea las excepciones de ejecución de un handler (herramienta, GitHub, inesperadas) a errores JSON-RPC.
+    """
+    @functools.wraps(fn)
+    async def wrapper(req: Request, id_, *args):
+        try:
+            return await fn(req, id_, *args)
+        except ToolError as te:
+            return jsonrpc_error(id_, code=te.code, message=str(te)), te.status_code
+        except aiohttp.ClientResponseError as ce:
+            return jsonrpc_error(id_, code=-32000, message=f"GitHub HTTP {ce.status}: {ce.message}"), 502
+        except Exception as e:
+            return jsonrpc_error(id_, code=-32001, message=f"Unhandled error: {e}"), 500
+    return wrapper
 
-    # Soporta un solo objeto JSON-RPC por request
-    method = body.get("method")
-    id_ = body.get("id")
+@jsonrpc_errors
+async def call_tool(req: Request, id_, name, arguments: dict) -> tuple[dict, int]:
+    handler = TOOL_DISPATCH.get(name)
+    if handler is None:
+        return jsonrpc_error(id_, code=-32601, message=f"Tool not found: {name}"), 400
+
+    cached = get_cached_result(name, arguments)
+    if cached is not None:
+        return jsonrpc_result(id_, cached), 200
+
+    # errores de entrada: se responden aquí, antes de cualquier I/O
+    try:
+        a = VALIDATORS[name](arguments)
+    except ValidationError as ve:
+        return jsonrpc_error(id_, code=-32602, message=f"Invalid params: {ve}"), 400
+
+    res = await handler(req.app.state.gh, req.app.state.http, a)
+    store_result(name, arguments, res)
+    return jsonrpc_result(id_, res), 200
+
+# Handlers de métodos JSON-RPC: (req, id_, body) -> (respuesta, status HTTP)
+async def _initialize(req: Request, id_, body: dict):
+    result = {
+        "protocolVersion": PROTOCOL,
+        "capabilities": {"tools": {}},
+        "serverInfo": SERVER_INFO,
+    }
+    return jsonrpc_result(id_, result), 200
+
+async def _initialized(req: Request, id_, body: dict):
+    # Notificación sin respuesta
+    return None, 204
+
+async def _tools_list(req: Request, id_, body: dict):
+    return jsonrpc_result(id_, _TOOLS_LIST_RESULT), 200
+
+async def _tools_call(req: Request, id_, body: dict):
     params = body.get("params") or {}
-    is_notification = "id" not in body
+    name = params.get("name")
+    arguments = params.get("arguments") or {}
 
-    if method == "initialize":
-        result = {
-            "protocolVersion": PROTOCOL,
-            "capabilities": {"tools": {}},
-            "serverInfo": SERVER_INFO,
-        }
-        return JSONResponse(jsonrpc_result(id_, result))
+    # Triviales (sync)
+    if name in ("echo", "random_pokemon"):
+        return jsonrpc_result(id_, handle_tool(name, arguments)), 200
 
-    if method == "initialized":
-        # Notificación sin respuesta (pero HTTP necesita 204/200 vacío)
-        return Response(status_code=204)
+    # GitHub / files (async, vía TOOL_DISPATCH)
+    return await call_tool(req, id_, name, arguments)
+
+async def _method_not_found(req: Request, id_, body: dict):
+    if "id" not in body:
+        return None, 204
+    return jsonrpc_error(id_, code=-32601, message="Method not found"), 400
 
-    if method == "tools/list":
-        return JSONResponse(jsonrpc_result(id_, {"tools": TOOLS}))
+METHOD_HANDLERS = {
+    "initialize": _initialize,
+    "initialized": _initialized,
+    "tools/list": _tools_list,
+    "tools/call": _tools_call,
+}
 
-    if method == "tools/call":
-        params = body.get("params") or {}
-        name = params.get("name")
-        arguments = params.get("arguments") or {}
-        
-        # Triviales (sync)
-        if name in ("echo", "random_pokemon"):
-            tool_result = handle_tool(name, arguments)
-            return JSONResponse(jsonrpc_result(id_, tool_result))
+async def handle_message(req: Request, body) -> tuple[Optional[dict], int]:
+    """
+    Procesa un mensaje JSON-RPC. Devuelve (respuesta, status HTTP); respuesta None si no hay que contestar.
+    """
+    if not isinstance(body, dict):
+        return jsonrpc_error(None), 400
 
-        # GitHub (async con aiohttp + GitHubClient)
-        gh = GitHubClient()
-        timeout = aiohttp.ClientTimeout(total=25, connect=5)
+    id_ = body.get("id")
+    params = body.get("params")
+    if params is not None and not isinstance(params, dict):
+        return jsonrpc_error(id_, code=-32602, message="Invalid params: params must be an object"), 400
+    if params and params.get("arguments") is not None and not isinstance(params["arguments"], dict):
+        return jsonrpc_error(id_, code=-32602, message="Invalid params: arguments must be an object"), 400
 
-        try:
-            if name == "github_repo_info":
-                a = RepoInfoArgs(**arguments)
-                async with aiohttp.ClientSession(timeout=timeout) as session:
-                    data = await gh.repo_summary(session, a.owner, a.repo)
-                text = (f"{data['full_name']} — {data['stars']} | 🍴 {data['forks']} | "
-                        f"issues {data['open_issues']} | default: {data['default_branch']}")
-                return JSONResponse(jsonrpc_result(id_, mcp_text_result(text, data)))
-
-            elif name == "github_list_issues":
-                a = ListIssuesArgs(**arguments)
-                async with aiohttp.ClientSession(timeout=timeout) as session:
-                    items = await gh.list_issues(session, a.owner, a.repo, a.state, a.labels, a.assignee, a.limit)
-                if not items:
-                    text = f"Sin issues para {a.owner}/{a.repo} con esos filtros."
-                else:
-                    lines = []
-                    for it in items[:10]:
-                        lbls = ",".join(it.get("labels") or []) or "-"
-                        lines.append(f"#{it['number']} {it['title']} [{it['state']}] @{it.get('author','?')} ({lbls})")
-                    more = "" if len(items) <= 10 else f"\n… y {len(items)-10} más"
-                    text = f"Issues en {a.owner}/{a.repo} (state={a.state}):\n" + "\n".join(lines) + more
-                return JSONResponse(jsonrpc_result(id_, mcp_text_result(text, items)))
-
-            elif name == "github_get_file":
-                a = GetFileArgs(**arguments)
-                async with aiohttp.ClientSession(timeout=timeout) as session:
-                    data = await gh.get_file(session, a.owner, a.repo, a.path, a.ref)
-                preview = (data.get("content") or "")[:500]
-                tail = "" if not data.get("content") or len(data["content"]) <= 500 else "\n…(truncado)"
-                text = f"{a.owner}/{a.repo}@{a.ref or 'HEAD'} — {a.path} (size={data.get('size')}):\n{preview}{tail}"
-                return JSONResponse(jsonrpc_result(id_, mcp_text_result(text, data)))
-
-            elif name == "github_search_issues":
-                a = SearchIssuesArgs(**arguments)
-                async with aiohttp.ClientSession(timeout=timeout) as session:
-                    items = await gh.search_issues(session, a.query, a.limit)
-                lines = [f"{it['repo']} #{it.get('number','?')}: {it['title']}" for it in items[:10]]
-                more = "" if len(items) <= 10 else f"\n… y {len(items)-10} más"
-                text = "Resultados de búsqueda:\n" + ("\n".join(lines) if lines else "— vacío —") + more
-                return JSONResponse(jsonrpc_result(id_, mcp_text_result(text, items)))
-
-            elif name == "github_pr_status":
-                a = PRStatusArgs(**arguments)
-                async with aiohttp.ClientSession(timeout=timeout) as session:
-                    info = await gh.pr_status(session, a.owner, a.repo, a.number)
-                checks = info.get("checks_summary", {})
-                text = (f"PR #{info['number']} {info['title']} — state={info['state']}, "
-                        f"mergeable={info['mergeable']}, draft={info['draft']}, "
-                        f"checks={checks.get('total',0)} ({','.join(checks.get('statuses',[])) or '-'})")
-                return JSONResponse(jsonrpc_result(id_, mcp_text_result(text, info)))
-
-            elif name == "github_compare":
-                a = CompareArgs(**arguments)
-                async with aiohttp.ClientSession(timeout=timeout) as session:
-                    comp = await gh.compare(session, a.owner, a.repo, a.base, a.head)
-                files = comp.get("files", [])
-                first = "\n".join([f"{f['status']:>9}  +{f['additions']}/-{f['deletions']}  {f['filename']}"
-                                   for f in files[:10]])
-                more = "" if len(files) <= 10 else f"\n… y {len(files)-10} más"
-                text = (f"Diff {a.base}...{a.head} — ahead {comp['ahead_by']}, behind {comp['behind_by']}, "
-                        f"commits {comp['total_commits']}\n{first}{more}")
-                return JSONResponse(jsonrpc_result(id_, mcp_text_result(text, comp)))
-            
-            elif name == "files_list":
-                a = FilesListArgs(**arguments)
-                target = _resolve_safe(a.path)
-                if not target.exists():
-                    return JSONResponse(jsonrpc_error(id_, code=-32000, message=f"No existe: {a.path}"), status_code=404)
-                if not target.is_dir():
-                    return JSONResponse(jsonrpc_error(id_, code=-32000, message=f"No es directorio: {a.path}"), status_code=400)
-
-                entries = []
-                count = 0
-                if a.recursive:
-                    for root, dirs, files in os.walk(target):
-                        for d in dirs:
-                            p = pathlib.Path(root) / d
-                            rel = str(p.relative_to(FILES_ROOT_PATH))
-                            stat = p.stat()
-                            entries.append({"path": rel, "is_dir": True, "size": stat.st_size})
-                            count += 1
-                            if count >= a.limit: break
-                        if count >= a.limit: break
-                        for f in files:
-                            p = pathlib.Path(root) / f
-                            rel = str(p.relative_to(FILES_ROOT_PATH))
-                            stat = p.stat()
-                            entries.append({"path": rel, "is_dir": False, "size": stat.st_size})
-                            count += 1
-                            if count >= a.limit: break
-                        if count >= a.limit: break
-                else:
-                    for p in target.iterdir():
-                        rel = str(p.relative_to(FILES_ROOT_PATH))
-                        stat = p.stat()
-                        entries.append({"path": rel, "is_dir": p.is_dir(), "size": stat.st_size})
-                        count += 1
-                        if count >= a.limit: break
-
-                txt_lines = [f"[DIR] {e['path']}" if e["is_dir"] else f"      {e['path']} ({e['size']} bytes)" for e in entries[:20]]
-                more = "" if len(entries) <= 20 else f"\n… y {len(entries)-20} más"
-                text = f"Listado de {a.path} (root={FILES_ROOT}):\n" + ("\n".join(txt_lines) if txt_lines else "— vacío —") + more
-                return JSONResponse(jsonrpc_result(id_, mcp_text_result(text, entries)))
-
-            elif name == "files_read":
-                a = FilesReadArgs(**arguments)
-                p = _resolve_safe(a.path)
-                if not p.exists():
-                    return JSONResponse(jsonrpc_error(id_, code=-32000, message=f"No existe: {a.path}"), status_code=404)
-                if not p.is_file():
-                    return JSONResponse(jsonrpc_error(id_, code=-32000, message=f"No es archivo: {a.path}"), status_code=400)
-
-                data = p.read_bytes()
-                size = len(data)
-                start = min(a.offset, size)
-                end = min(start + a.limit, size)
-                chunk = data[start:end].decode("utf-8", errors="replace")
-                eof = (end >= size)
-
-                preview = chunk[:500]
-                tail = "" if len(chunk) <= 500 else "\n…(truncado)"
-                text = f"{a.path} [{start}:{end}/{size}] eof={eof}\n{preview}{tail}"
-                payload = {"path": a.path, "offset": start, "end": end, "size": size, "eof": eof, "content": chunk}
-                return JSONResponse(jsonrpc_result(id_, mcp_text_result(text, payload)))
-
-            else:
-                return JSONResponse(jsonrpc_error(id_, code=-32601, message=f"Tool not found: {name}"), status_code=400)
-
-        except ValidationError as ve:
-            return JSONResponse(jsonrpc_error(id_, code=-32602, message=f"Invalid params: {ve}"), status_code=400)
-        except aiohttp.ClientResponseError as ce:
-            return JSONResponse(jsonrpc_error(id_, code=-32000, message=f"GitHub HTTP {ce.status}: {ce.message}"), status_code=502)
-        except Exception as e:
-            return JSONResponse(jsonrpc_error(id_, code=-32001, message=f"Unhandled error: {e}"), status_code=500)
+    method = body.get("method")
+    handler = METHOD_HANDLERS.get(method, _method_not_found) if isinstance(method, str) else _method_not_found
+    # Un fallo inesperado se responde en su propio mensaje: el resto del batch sigue contestándose
+    try:
+        return await handler(req, id_, body)
+    except Exception as e:
+        return jsonrpc_error(id_, code=-32603, message=f"Internal error: {e}"), 500
 
-    # Método desconocido
-    if is_notification:
+# Máximo de mensajes por batch: todos se ejecutan a la vez
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "50"))
+
+_INITIALIZED_MARKERS = (b'"method":"initialized"', b'"method": "initialized"')
+
+# Endpoints
+@app.get("/health")
+def health():
+    return {"ok": True, "server": SERVER_INFO}
+
+@app.post("/")
+async def rpc(req: Request):
+    check_auth(req)
+    raw = await req.body()
+
+    # Fast-path: la notificación `initialized` (nombre legado) no tiene respuesta, se reconoce sin decodificar
+    # el JSON. Solo con cuerpos cortos: así la ausencia de "id" se comprueba sobre el mensaje completo
+    if len(raw) <= 128 and raw.lstrip()[:1] == b"{" and b'"id"' not in raw and any(m in raw for m in _INITIALIZED_MARKERS):
         return Response(status_code=204)
-    return JSONResponse(jsonrpc_error(id_, code=-32601, message="Method not found"), status_code=400)
+
+    try:
+        body = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return ORJSONResponse(jsonrpc_error(None, message="Invalid JSON"), status_code=400)
+
+    # Batch JSON-RPC: los mensajes se procesan concurrentemente; las notificaciones no generan respuesta
+    if isinstance(body, list):
+        if not body:
+            return ORJSONResponse(jsonrpc_error(None), status_code=400)
+        if len(body) > MAX_BATCH_SIZE:
+            return ORJSONResponse(
+                jsonrpc_error(None, message=f"Invalid Request: batch exceeds {MAX_BATCH_SIZE} messages"), status_code=400
+            )
+        results = await asyncio.gather(*(handle_message(req, msg) for msg in body))
+        responses = [res for res, _ in results if res is not None]
+        if not responses:
+            return Response(status_code=204)
+        return ORJSONResponse(responses)
+
+    res, status = await handle_message(req, body)
+    if res is None:
+        # HTTP necesita 204/200 vacío
+        return Response(status_code=status)
+    return ORJSONResponse(res, status_code=status)